@@ -30,6 +30,10 @@ unnecessary transfers of unchanged files.
 the corpus in a format that makes it usable by the `metapy toolkit`
 (https://github.com/meta-toolkit/metapy).
 
+Finally, `get_rfcs` builds the spelling dictionary, stored in the
+`idx/spelling/` folder, used by RFC Finder to correct misspelled query
+terms out of the vocabulary of the inverted index (see `spelling`).
+
 Docstrings in this module styled according to the `NumPy Style Guide
 for Docstrings https://numpydoc.readthedocs.io/en/latest/format.html`_.
 """
@@ -45,6 +49,7 @@ import metapy
 import os
 import pytoml
 import re
+import spelling
 import subprocess
 import sys
 import time
@@ -139,6 +144,27 @@ v 0.0.1 | MIT License | 2023 | by Gilberto Ramirez <ger6@illinois.edu>
           "] Forward index done! {0} docs, {1} unique terms"
           .format(fidx.num_docs(), fidx.unique_terms()))
 
+  # build the spelling dictionary if indices were recreated or if it
+  # does not exist yet, e.g., indices were created by an older version
+  # (`params.npy` is the last file written to the dictionary folder)
+  if file_count > 0 or not os.path.isfile('idx/spelling/params.npy'):
+    print("[" + str(datetime.now()) + "] Building spelling dictionary...")
+    idx = metapy.index.make_inverted_index('config.toml')
+    terms = []
+    doc_freqs = []
+    for term_id in range(idx.unique_terms()):
+      term = idx.term_text(term_id)
+      # keep all alphabetic terms, even rare ones, so they are not taken
+      # as misspellings; only frequent ones will be suggested
+      if term.isalpha():
+        terms.append(term)
+        doc_freqs.append(idx.doc_freq(term_id))
+    num_deletes = spelling.build_spelling_dictionary(terms, doc_freqs,
+                                                     'idx/spelling/')
+    print("[" + str(datetime.now()) +
+          "] Spelling dictionary done! {0} terms, {1} unique deletes"
+          .format(len(terms), num_deletes))
+
   elapsed_time = round(time.time() - start_time)
   print("[" + str(datetime.now()) + "] " +
         "Corpus update done! It took me {} second".format(elapsed_time) +
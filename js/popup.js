@@ -176,15 +176,30 @@ $(document).ready(function(){
         },
         error: function(error) {
           $("#non-navbar-space").addClass("vh-100-adjusted"); // small content to be added
-          var resultsHtml = "<p class='text-danger fs-5'>";
-          resultsHtml += "Oops! It seems the backend is broken.";
-          $("#searchResults").html(resultsHtml);
+          $("#searchResults").html(backendErrorHtml(error));
           console.log("API request failed: " + error);
         }
       });
     }
   });
 
+  // build the error message to show when an API call fails
+  function backendErrorHtml(error) {
+    var resultsHtml = "<p class='text-danger fs-5'>";
+    if (error.status === 503) {
+      // backend is up but the stages needed are not ready
+      var stages = error.responseJSON ? Object.values(error.responseJSON.stages) : [];
+      if (stages.some(stage => stage.status === "failed")) {
+        resultsHtml += "This feature is not available. Check http://127.0.0.1:5000/ready for details.";
+      } else {
+        resultsHtml += "The backend is still loading. Please try again in a few seconds.";
+      }
+    } else {
+      resultsHtml += "Oops! It seems the backend is broken.";
+    }
+    return resultsHtml;
+  }
+
   // make API call to recover topics data, get the results, and
   // populate all the right HTML elements with those results
   function loadTopics() {
@@ -424,9 +439,7 @@ $(document).ready(function(){
       },
       error: function(error) {
         $("#non-navbar-space").addClass("vh-100-adjusted"); // small content to be added
-        var resultsHtml = "<p class='text-danger fs-5'>";
-        resultsHtml += "Oops! It seems the backend is broken.";
-        $("#topics").html(resultsHtml);
+        $("#topics").html(backendErrorHtml(error));
         console.log("API request failed: " + error);
       }
     });
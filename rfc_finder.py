@@ -25,6 +25,22 @@ the RFCs in ASCII format hosted in the RFC Editor web site
 (https://www.rfc-editor.org/). The search is performed by a separate
 module, `search`, also part of this project.
 
+`http://127.0.0.1:5000/graph` is the API endpoint returning the
+obsoletes/updates links and the supersession chain of a given RFC.
+
+JSON payloads of `/search` and `/topics` are compressed with brotli (if
+the optional `brotli` package is installed) or gzip depending on the
+`Accept-Encoding` header sent by the client. Compressed forms of the
+most requested payloads are cached.
+
+The web service starts listening right away and loads the RFCs corpus
+in a background thread in stages: metadata, search index, and topics.
+`http://127.0.0.1:5000/ready` reports the status of every stage, and
+endpoints whose stages are not ready yet answer with HTTP 503 instead
+of failing. Heavy dependencies, e.g., `metapy` or `pandas`, are only
+imported by the background thread, so the `/` health check is
+available as soon as the process starts.
+
 Docstrings in this module styled according to the `NumPy Style Guide
 for Docstrings https://numpydoc.readthedocs.io/en/latest/format.html`_.
 """
@@ -37,7 +53,17 @@ __status__ = "Prototype"
 
 from bottle import route, run, request, get
 from bottle import hook, response, HTTPResponse, static_file
-import rfcs
+from collections import OrderedDict
+from functools import lru_cache
+import gzip
+import json
+import threading
+
+try:
+  import brotli
+except ImportError:
+  # brotli is optional, gzip will be used instead
+  brotli = None
 
 cors_headers = {
     'Access-Control-Allow-Origin': '*',
@@ -48,6 +74,13 @@ cors_headers = {
     # 'Access-Control-Allow-Credentials': 'true',
 }
 
+# payloads smaller than this (in bytes) are not worth compressing
+min_compress_size = 512
+
+# loaded in the background by `warm_up()`
+rfcs_corpus = None
+warm_up_error = None
+
 print("""
  ______  _______ _______    _______ _           _             
 (_____ \(_______|_______)  (_______|_)         | |            
@@ -70,28 +103,212 @@ def enable_cors():
     for key, value in cors_headers.items():
        response.set_header(key, value)
 
+def negotiate_encoding(accept_encoding):
+  """
+  Select the content encoding to be used in a response given the value
+  of the `Accept-Encoding` request header. The coding with the highest
+  quality value (`q`) is selected, and brotli is preferred over gzip
+  only when both have the same quality and the `brotli` package is
+  available.
+
+  Parameters
+  ----------
+  accept_encoding : str
+    Value of the `Accept-Encoding` request header, e.g., 'gzip, br'.
+
+  Returns
+  -------
+  str
+    'br', 'gzip', or None if no compression must be used.
+  """
+
+  qualities = {}
+  for token in accept_encoding.lower().split(','):
+    params = [param.strip() for param in token.split(';')]
+    if params[0] == '':
+      continue
+    quality = 1.0
+    for param in params[1:]:
+      if param.startswith('q='):
+        try:
+          quality = float(param[2:])
+        except ValueError:
+          quality = 0.0
+    qualities[params[0]] = quality
+
+  # codings in order of preference to break ties
+  codings = ['gzip']
+  if brotli is not None:
+    codings.insert(0, 'br')
+
+  best_coding = None
+  best_quality = 0.0
+  for coding in codings:
+    # '*' applies to any coding not explicitly listed
+    quality = qualities.get(coding, qualities.get('*', 0.0))
+    if quality > best_quality:
+      best_coding = coding
+      best_quality = quality
+
+  # the client might prefer an uncompressed response, e.g., 'identity'
+  if qualities.get('identity', 0.0) > best_quality:
+    return None
+  return best_coding
+
+@lru_cache(maxsize=256)
+def compress(payload, encoding):
+  """
+  Compress `payload` using `encoding`, either 'br' or 'gzip'. Results
+  are cached, so hot responses are only compressed once.
+  """
+
+  if encoding == 'br':
+    return brotli.compress(payload)
+  return gzip.compress(payload, compresslevel=6)
+
+def send_json(payload):
+  """
+  Prepare the response for a JSON `payload`, already serialized as
+  bytes, compressing it if the client accepts it.
+  """
+
+  response.content_type = 'application/json'
+  response.set_header('Vary', 'Accept-Encoding')
+  encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+  if encoding is None or len(payload) < min_compress_size:
+    return payload
+
+  response.set_header('Content-Encoding', encoding)
+  return compress(payload, encoding)
+
+def warm_up():
+  """
+  Import the `rfcs` module and load the RFCs corpus stage by stage. It
+  is meant to run in a background thread while the web service is
+  already listening.
+  """
+
+  global rfcs_corpus, warm_up_error
+
+  try:
+    import rfcs
+    corpus = rfcs.RFCs(warm_up=False)
+  except Exception as e:
+    warm_up_error = '{}: {}'.format(type(e).__name__, e)
+    return
+
+  rfcs_corpus = corpus
+  rfcs_corpus.warm_up()
+
+def readiness():
+  """
+  Get the loading status of every stage of the RFCs corpus.
+
+  Returns
+  -------
+  OrderedDict
+    Dictionary with a `ready` flag, True when the stages needed by
+    `/search` are ready, a `loading` flag, True while any stage is still
+    pending or loading, and the status of every stage under `stages`.
+    Stages that failed, e.g., `topics` when `models/` is missing, are
+    reported under `stages` but do not make the service not ready.
+  """
+
+  if rfcs_corpus is None:
+    # `rfcs` module still being imported (or its import failed)
+    status = {'status': 'pending'}
+    if warm_up_error is not None:
+      status = {'status': 'failed', 'error': warm_up_error}
+    stages = OrderedDict((stage, dict(status))
+                         for stage in ('metadata', 'index', 'topics'))
+  else:
+    stages = OrderedDict((stage, dict(status))
+                         for stage, status in rfcs_corpus.stages.items())
+
+  return OrderedDict([
+    ('ready', all(stages[stage]['status'] == 'ready'
+                  for stage in ('metadata', 'index'))),
+    ('loading', any(stage['status'] in ('pending', 'loading')
+                    for stage in stages.values())),
+    ('stages', stages),
+  ])
+
+def not_ready(*stages):
+  """
+  Check whether any of the given `stages` of the RFCs corpus is not ready
+  yet and, in that case, turn the response into an HTTP 503 one.
+
+  Returns
+  -------
+  bytes
+    JSON payload describing the readiness of `stages`, or None if all
+    of them are ready.
+  """
+
+  if rfcs_corpus is not None and rfcs_corpus.is_ready(*stages):
+    return None
+
+  status = readiness()
+  response.status = 503
+  response.content_type = 'application/json'
+  return json.dumps(OrderedDict([
+    ('error', 'not ready'),
+    ('stages', OrderedDict((stage, status['stages'][stage])
+                           for stage in stages)),
+  ])).encode('utf8')
+
 @route('/')
 def healthcheck():
   return "All good with root!"
 
+@route('/ready')
+def get_readiness():
+  status = readiness()
+  # only the stages needed by `/search` decide the status code, so the
+  # service is ready while topics are still loading (or failed to load)
+  if not status['ready']:
+    response.status = 503
+  return status
+
 @route('/search')
 def search_terms():
   global rfcs_corpus
 
+  payload = not_ready('metadata', 'index')
+  if payload is not None:
+    return payload
+
   q = request.query.q
-  return rfcs_corpus.search(q)
+  # `expand=0` only reports corrections of misspelled terms
+  expand = request.query.get('expand', '1') != '0'
+  return send_json(rfcs_corpus.search(q, expand=expand))
 
 @route('/topics')
 def search_terms():
   global rfcs_corpus
 
+  payload = not_ready('metadata', 'topics')
+  if payload is not None:
+    return payload
+
+  docid = request.query.docid
+  return send_json(rfcs_corpus.get_topics(docid))
+
+@route('/graph')
+def get_graph():
+  global rfcs_corpus
+
+  payload = not_ready('metadata')
+  if payload is not None:
+    return payload
+
   docid = request.query.docid
-  return rfcs_corpus.get_topics(docid)
+  return rfcs_corpus.get_graph(docid)
 
 @route('/favicon.ico')
 def get_favicon():
   return static_file('icon-16.png', root='./images/')
 
-rfcs_corpus = rfcs.RFCs()
+threading.Thread(target=warm_up, daemon=True).start()
 
 run(host='localhost', port=5000, debug=True)
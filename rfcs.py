@@ -25,6 +25,29 @@ pi_df: pandas dataframe
   topic. All probabilities across same row must add up to 1, i.e., a
   document cannot be part of other non-listed topics.
 
+graph: dict
+  Citation graph compiled from the `obsoletes` and `updates` links in
+  the RFCs metadata. Links are stored as CSR (compressed sparse row)
+  arrays indexed by the position of every RFC in the `rfc-index >
+  rfc-entry` XML tree, together with a precomputed PageRank-style
+  authority score per RFC.
+
+metadata_json: dict
+  JSON fragments with the metadata of every RFC indexed by document ID,
+  e.g., RFC0001. Fragments are serialized once at load time and are
+  stitched into `search()` and `get_topics()` responses as bytes.
+
+stages: OrderedDict
+  Loading status of every subsystem, i.e., `metadata`, `index`, and
+  `topics`, in the order they are loaded by `warm_up()`. Every stage is
+  a dict with a `status` ('pending', 'loading', 'ready', or 'failed'),
+  and, once finished, the `seconds` it took and the `error`, if any.
+
+spelling: SpellingDictionary
+  Memory mapped spelling dictionary built by `get_rfcs.py` and used to
+  expand queries with corrections of misspelled terms. None if it has
+  not been built yet.
+
 This class assumes all the IETF RFC files and all the configuration
 files, i.e., `file.toml` and `rfcs-full-corpus.txt` are available in
 the `./corpus/` folder. Please refer to
@@ -32,6 +55,10 @@ the `./corpus/` folder. Please refer to
 more details on how to setup the RFC Finder applicatio before using
 this class.
 
+Heavy dependencies, i.e., `metapy` and `pandas`, are only imported by
+the methods needing them, so importing this module stays cheap and a
+missing dependency only affects the subsystem making use of it.
+
 Docstrings in this module styled according to the `NumPy Style Guide
 for Docstrings https://numpydoc.readthedocs.io/en/latest/format.html`_.
 """
@@ -42,20 +69,25 @@ __version__ = '0.0.1'
 __email__ = 'ger6@illinois.edu'
 __status__ = 'Prototype'
 
-import metapy
+import json
 import numpy as np
-import pandas as pd
+import os
 import re
+import spelling
+import sys
+import time
 import xmltodict
 from collections import OrderedDict
 
 class RFCs:
-  def __init__(self, filename='./corpus/rfcs/rfc-index.xml'):
+  def __init__(self, filename='./corpus/rfcs/rfc-index.xml', warm_up=True):
     """
     Constructor loads the RFCs metadata which will be used to provide
     details on RFCs returned by the `search()` method or the `topics()`
-    methods. It will also load the topics coverage matrix needed by
-    the `topics()` method.
+    methods. It will also load the inverted index needed by the
+    `search()` method and the topics coverage matrix needed by the
+    `topics()` method. Loading can be deferred, e.g., to run it in a
+    background thread, calling `warm_up()` later.
 
     Parameters
     ----------
@@ -63,14 +95,88 @@ class RFCs:
       Absolute or relative path of the XML filename containing RFCs
       metadata. Default: './corpus/rfcs/rfc-index.xml'.
 
+    warm_up : bool
+      Whether to load all subsystems right away. Default: True.
+
     Returns
     -------
     RFCs
       An instance of the RFCs class.
     """
-    self.metadata = self.load_metadata(filename=filename)
+    self.filename = filename
+    self.metadata = None
+    self.graph = None
+    self.metadata_json = None
+    self.idx = None
+    self.analyzer = None
+    self.spelling = None
+    self.pi_df = None
+    self.stages = OrderedDict((stage, {'status': 'pending'})
+                              for stage in ('metadata', 'index', 'topics'))
+    if warm_up:
+      self.warm_up()
+
+  def warm_up(self):
+    """
+    Load all subsystems in stages: first the metadata (including the
+    citation graph and the serialized metadata), then the inverted index,
+    and finally the topics coverage matrix. A stage failing, e.g., when
+    the `models/` folder is missing, is recorded in `stages` and does not
+    prevent the following stages from loading.
+    """
+
+    loaders = {
+      'metadata': self._warm_up_metadata,
+      'index': self._warm_up_index,
+      'topics': self._warm_up_topics,
+    }
+    for stage in self.stages:
+      start_time = time.time()
+      self.stages[stage] = {'status': 'loading'}
+      try:
+        loaders[stage]()
+        self.stages[stage] = {'status': 'ready'}
+      except Exception as e:
+        self.stages[stage] = {'status': 'failed',
+                              'error': '{}: {}'.format(type(e).__name__, e)}
+      self.stages[stage]['seconds'] = round(time.time() - start_time, 3)
+
+  def _warm_up_metadata(self):
+    """
+    Load the RFCs metadata, its citation graph, and its JSON fragments.
+    """
+
+    self.metadata = self.load_metadata(filename=self.filename)
+    self.graph = self.load_citation_graph()
+    self.metadata_json = self.serialize_metadata()
+
+  def _warm_up_index(self):
+    """
+    Load the inverted index, the analyzer, and the spelling dictionary
+    used by `search()`.
+    """
+
+    import metapy
+
+    self.idx = self.load_index()
+    self.analyzer = metapy.analyzers.load('config.toml')
+    self.spelling = self.load_spelling()
+
+  def _warm_up_topics(self):
+    """
+    Load the topics coverage matrix used by `get_topics()`.
+    """
+
     self.pi_df = self.load_topics_coverage()
 
+  def is_ready(self, *stages):
+    """
+    Check whether all the given `stages`, e.g., 'metadata' and 'index',
+    finished loading successfully.
+    """
+
+    return all(self.stages[stage]['status'] == 'ready' for stage in stages)
+
   def load_metadata(self, filename):
     """
     Load RFCs metadata from `filename` (`./corpus/rfcs/rfc-index.xml` by
@@ -169,46 +275,457 @@ class RFCs:
 
     return result
 
-  def search(self, query_terms):
+  def serialize_metadata(self):
+    """
+    Serialize the metadata of every RFC, as returned by `get_metadata()`,
+    into a JSON fragment. Fragments are left open, i.e., without the
+    closing brace, so per-request fields such as `score` can be appended
+    by `_hit_json()` without serializing the metadata again.
+
+    Returns
+    -------
+    dict
+      Dictionary mapping every `docid`, e.g., RFC0001, to the bytes of
+      its JSON fragment.
+    """
+
+    metadata_json = {}
+    for docid in self.metadata['docid_to_index'].keys():
+      metadata = json.dumps(self.get_metadata(docid), separators=(',', ':'))
+      # drop the closing brace so more fields can be appended later
+      metadata_json[docid] = metadata.encode('utf8')[:-1]
+
+    return metadata_json
+
+  def _hit_json(self, docid, fields):
+    """
+    Stitch the precomputed JSON fragment of `docid` with `fields`, a list
+    of (name, value) tuples, into the bytes of a complete JSON object.
+    """
+
+    fragment = self.metadata_json.get(docid, b'{')
+    extra = b','.join(json.dumps(name).encode('utf8') + b':' +
+                      json.dumps(value).encode('utf8')
+                      for name, value in fields)
+    if fragment == b'{' or extra == b'':
+      return fragment + extra + b'}'
+    return fragment + b',' + extra + b'}'
+
+  def load_citation_graph(self):
+    """
+    Compile the `obsoletes` and `updates` links found in every
+    `rfc-entry` of the RFCs metadata into a citation graph. Every link
+    type is stored in CSR (compressed sparse row) form, i.e., a pair of
+    `indptr` and `indices` arrays, where node `i` is the index of the RFC
+    in the `rfc-index > rfc-entry` XML tree (see `docid_to_index`) and
+    its neighbors are `indices[indptr[i]:indptr[i + 1]]`. Links listed
+    in either direction, e.g., `obsoletes` in one RFC or `obsoleted-by`
+    in the other, are merged, so both directions are always consistent
+    even if `rfc-index.xml` only lists one of them. A PageRank-style
+    authority score is also precomputed for every RFC, so ranking only
+    needs array lookups at query time.
+
+    Returns
+    -------
+    dict
+      Dictionary with the CSR arrays for `obsoletes`, `obsoleted-by`,
+      `updates`, and `updated-by`, plus the arrays `authority` (PageRank
+      values), `prior` (authority scaled to [0, 1]), and `obsoleted`
+      (True for every RFC obsoleted by at least one other RFC).
+    """
+
+    rfc_entries = self.metadata['rfc-index']['rfc-entry']
+    docid_to_index = self.metadata['docid_to_index']
+    num_rfcs = len(rfc_entries)
+
+    graph = {}
+    reverse_links = {'obsoletes': 'obsoleted-by', 'updates': 'updated-by'}
+    for link, reverse_link in reverse_links.items():
+      edges = set()
+      for i, rfc_entry in enumerate(rfc_entries):
+        for entry_link, reverse in ((link, False), (reverse_link, True)):
+          # an empty XML element is parsed by `xmltodict` as None
+          link_entry = rfc_entry.get(entry_link) or {}
+          for docid in self._as_list(link_entry.get('doc-id')):
+            # links might point to documents outside the RFC series,
+            # e.g., IEN or NIC documents, so skip them
+            j = docid_to_index.get(docid)
+            if j is not None:
+              edges.add((j, i) if reverse else (i, j))
+      src = [edge[0] for edge in edges]
+      dst = [edge[1] for edge in edges]
+      graph[link] = self._to_csr(src, dst, num_rfcs)
+      graph[reverse_link] = self._to_csr(dst, src, num_rfcs)
+
+    authority = self.compute_authority(graph)
+    # authority is heavily skewed towards a handful of foundational RFCs,
+    # e.g., RFC0791, so scale it in log space before normalizing to [0, 1]
+    prior = np.log1p(authority * num_rfcs)
+    if num_rfcs > 0 and prior.max() > 0:
+      prior /= prior.max()
+
+    graph['authority'] = authority
+    graph['prior'] = prior
+    graph['obsoleted'] = np.diff(graph['obsoleted-by']['indptr']) > 0
+
+    return graph
+
+  def _as_list(self, value):
+    """
+    Normalize a value parsed by `xmltodict` into a list since XML
+    elements appearing once are parsed as scalars and those appearing
+    more than once as lists.
+    """
+
+    if value is None:
+      return []
+    if type(value) is not list:
+      return [value]
+    return value
+
+  def _to_csr(self, src, dst, num_nodes):
+    """
+    Build the CSR arrays, `indptr` and `indices`, of a directed graph
+    with `num_nodes` nodes given its edges as two parallel lists of
+    source and destination nodes.
+    """
+
+    src = np.asarray(src, dtype=np.int32)
+    dst = np.asarray(dst, dtype=np.int32)
+    # sort edges by source node (and destination node to break ties)
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(src, minlength=num_nodes))
+
+    return {'indptr': indptr, 'indices': dst[order]}
+
+  def compute_authority(self, graph, damping=0.85, max_iters=100, tol=1e-10):
+    """
+    Compute a PageRank-style authority score for every RFC using the
+    power iteration method over the `updates` and `obsoleted-by` links,
+    i.e., authority flows from newer RFCs to the RFCs they update, and
+    from obsoleted RFCs to their replacements.
+
+    Parameters
+    ----------
+    graph : dict
+      Citation graph as built by `load_citation_graph()`.
+
+    damping : float
+      PageRank damping factor. Default: 0.85.
+
+    max_iters : int
+      Maximum number of power iterations. Default: 100.
+
+    tol : float
+      Convergence threshold on the L1 norm of the difference between
+      two consecutive iterations. Default: 1e-10.
+
+    Returns
+    -------
+    numpy array
+      Authority score per RFC indexed as in `docid_to_index`. All
+      scores add up to 1.
+    """
+
+    num_rfcs = len(graph['obsoletes']['indptr']) - 1
+    if num_rfcs == 0:
+      return np.zeros(0)
+
+    links = ['updates', 'obsoleted-by']
+    src = np.concatenate([np.repeat(np.arange(num_rfcs),
+                                    np.diff(graph[link]['indptr']))
+                          for link in links])
+    dst = np.concatenate([graph[link]['indices'] for link in links])
+
+    out_degree = np.bincount(src, minlength=num_rfcs).astype(float)
+    dangling = out_degree == 0
+    # edge weights do not change across iterations, so compute them once
+    edge_weight = 1.0 / out_degree[src]
+
+    authority = np.full(num_rfcs, 1.0 / num_rfcs)
+    for _ in range(max_iters):
+      # RFCs with no outgoing links spread their authority evenly
+      new_authority = np.bincount(dst, weights=authority[src] * edge_weight,
+                                  minlength=num_rfcs).astype(float)
+      new_authority += authority[dangling].sum() / num_rfcs
+      new_authority = damping * new_authority + (1.0 - damping) / num_rfcs
+      delta = np.abs(new_authority - authority).sum()
+      authority = new_authority
+      if delta < tol:
+        break
+
+    return authority
+
+  def _neighbors(self, link, i):
+    """
+    Get the indices of the RFCs linked to the RFC with index `i` through
+    `link`, e.g., 'obsoleted-by', in the citation graph.
+    """
+
+    indptr = self.graph[link]['indptr']
+    return self.graph[link]['indices'][indptr[i]:indptr[i + 1]]
+
+  def get_graph(self, docid):
+    """
+    Get the citation graph neighborhood of a given `docid`, including its
+    full supersession chain, i.e., all the RFCs that it transitively
+    obsoletes and all the RFCs that transitively obsolete it.
+
+    Parameters
+    ----------
+    docid : str
+      Document ID identifying the RFC such as RFC0001. It consists of
+      the text 'RFC' followed by a four digit number including leading
+      zeroes if any.
+
+    Returns
+    -------
+    dict
+      Dictionary with the direct `obsoletes`, `obsoleted-by`, `updates`,
+      and `updated-by` links of `docid`, its `authority` score, the
+      supersession `chain` sorted from oldest to newest RFC, and the
+      `latest` RFCs in that chain, i.e., those not obsoleted.
+    """
+
+    # if `docid` does not exist in metadata return an empty dictionary
+    if docid not in self.metadata['docid_to_index'].keys():
+      return {}
+
+    rfc_entries = self.metadata['rfc-index']['rfc-entry']
+    i = self.metadata['docid_to_index'][docid]
+
+    # walk the supersession chain in both directions
+    chain = {i}
+    for link in ('obsoletes', 'obsoleted-by'):
+      pending = [i]
+      while pending:
+        for j in self._neighbors(link, pending.pop()):
+          if j not in chain:
+            chain.add(j)
+            pending.append(j)
+
+    # entries in `rfc-index.xml` are sorted by RFC number, so sorting by
+    # index also sorts the chain from oldest to newest
+    chain = sorted(int(j) for j in chain)
+
+    result = OrderedDict([('doc-id', docid),
+                          ('authority', float(self.graph['authority'][i])),
+                          ('obsoleted', bool(self.graph['obsoleted'][i]))])
+    for link in ('obsoletes', 'obsoleted-by', 'updates', 'updated-by'):
+      result[link] = [rfc_entries[j]['doc-id'] for j in self._neighbors(link, i)]
+    result['chain'] = [rfc_entries[j]['doc-id'] for j in chain]
+    result['latest'] = [rfc_entries[j]['doc-id'] for j in chain
+                        if not self.graph['obsoleted'][j]]
+
+    return result
+
+  def load_index(self):
+    """
+    Load the inverted index built for the RFCs corpus by `get_rfcs.py`
+    using the `metapy toolkit` (https://github.com/meta-toolkit/metapy),
+    so it does not need to be loaded again on every search.
+
+    Returns
+    -------
+    metapy.index.InvertedIndex
+      Inverted index for the RFCs corpus as configured in `config.toml`.
+    """
+
+    import metapy
+
+    return metapy.index.make_inverted_index('config.toml')
+
+  def load_spelling(self, path='./idx/spelling/'):
+    """
+    Memory map the spelling dictionary built by `get_rfcs.py` out of the
+    vocabulary of the inverted index.
+
+    Parameters
+    ----------
+    path : str
+      Folder where the spelling dictionary files are stored.
+      Default: './idx/spelling/'.
+
+    Returns
+    -------
+    SpellingDictionary
+      The spelling dictionary, or None if it does not exist or cannot be
+      loaded, in which case queries will not be expanded. Spelling
+      correction is optional, so errors do not prevent searching.
+    """
+
+    # `params.npy` is the last file written by `get_rfcs.py`
+    if not os.path.isfile(os.path.join(path, 'params.npy')):
+      return None
+
+    try:
+      return spelling.SpellingDictionary(path)
+    except Exception as e:
+      print('Spelling dictionary could not be loaded, queries will not be '
+            'expanded ({}: {})'.format(type(e).__name__, e), file=sys.stderr)
+      return None
+
+  def _analyze(self, text):
+    """
+    Get the terms `text` is turned into by the analyzer used to build the
+    inverted index, i.e., lowercased, stop words removed, and stemmed.
+    """
+
+    import metapy
+
+    doc = metapy.index.Document()
+    doc.content(text)
+    return list(self.analyzer.analyze(doc).keys())
+
+  def expand_query(self, query_terms, expand=True):
+    """
+    Look for corrections of the terms in `query_terms` missing from the
+    spelling dictionary, e.g., 'kerberso' or 'helman', and optionally
+    append them to the query. Query terms go through the same analyzer
+    used to build the inverted index, so suggestions are stemmed terms.
+    Since suggestions are analyzed again when searching, and stemming a
+    stem does not always give it back, e.g., 'agre' becomes 'agr', only
+    suggestions analyzed back into themselves are kept.
+
+    Parameters
+    ----------
+    query_terms : str
+      Query terms as entered by the user.
+
+    expand : bool
+      Whether to append the suggestions to `query_terms` or to only
+      report them. Default: True.
+
+    Returns
+    -------
+    tuple
+      Tuple (`query_terms`, `expansions`) where `query_terms` is the
+      (possibly expanded) query and `expansions` a list of dictionaries
+      with the misspelled `word`, its analyzed `term`, the `distance` to
+      the suggestions, the `suggestions` themselves, and the suggestions
+      `dropped` because they would not match themselves once analyzed.
+    """
+
+    # settings to be used when looking up suggestions
+    settings = {
+      'min_length': 4,
+      'max_edit_distance': 2,
+      'long_term_length': 6,
+      'max_suggestions': 2,
+    }
+
+    expansions = []
+    if self.spelling is None:
+      return query_terms, expansions
+
+    words = []
+    for word in re.findall(r'[^\W\d_]+', query_terms):
+      if word.lower() not in words:
+        words.append(word.lower())
+
+    for word in words:
+      terms = self._analyze(word)
+      # stop words are removed by the analyzer so skip them
+      if len(terms) != 1:
+        continue
+      term = terms[0]
+      if len(term) < settings['min_length'] or term in self.spelling:
+        continue
+      # short terms are only corrected within an edit distance of 1
+      # since there are too many terms within an edit distance of 2
+      max_edit_distance = settings['max_edit_distance']
+      if len(term) < settings['long_term_length']:
+        max_edit_distance = 1
+      suggestions = []
+      dropped = []
+      for suggestion in self.spelling.lookup(term,
+                                             max_edit_distance=max_edit_distance,
+                                             top_k=None):
+        if len(suggestions) == settings['max_suggestions']:
+          break
+        # suggestions are added to the query as text, so they must be
+        # analyzed back into the very same index term to match anything
+        if self._analyze(suggestion[0]) == [suggestion[0]]:
+          suggestions.append(suggestion)
+        else:
+          dropped.append(suggestion[0])
+      if not suggestions:
+        continue
+      expansions.append(OrderedDict([
+        ('word', word),
+        ('term', term),
+        ('distance', suggestions[0][1]),
+        ('suggestions', [suggestion[0] for suggestion in suggestions]),
+        ('dropped', dropped),
+      ]))
+
+    if expand and expansions:
+      query_terms += ' ' + ' '.join(suggestion
+                                    for expansion in expansions
+                                    for suggestion in expansion['suggestions'])
+
+    return query_terms, expansions
+
+  def search(self, query_terms, expand=True):
     """
     Implements a search across the entire RFCs corpus of a given query
     string, `query_terms`, using an inverted index and a BM25 ranker
     function. All the information retrieval calls use the `metapy
-    toolkit` (https://github.com/meta-toolkit/metapy).
+    toolkit` (https://github.com/meta-toolkit/metapy). BM25 scores are
+    blended with the authority prior of the citation graph and scores
+    of obsoleted RFCs are demoted, so replacements rank above them.
+    Misspelled query terms are corrected using the spelling dictionary
+    (see `expand_query()`).
 
     Parameters
     ----------
     query_terms : str
       Query terms that need to be searched in the inverted index.
 
+    expand : bool
+      Whether to expand the query with corrections of misspelled terms
+      or to only report them. Default: True.
+
     Returns
     -------
-    dict
-      Dictionary with all results in the form of an array of dictionaries
-      where each dictionary entry corresponds to RFC metadata of a
-      relevant document returned by a ranker function running on top of
-      an inverted index built for the RFCs corpus.
+    bytes
+      JSON object with all results in the form of an array of objects
+      where each object corresponds to RFC metadata of a relevant
+      document returned by a ranker function running on top of an
+      inverted index built for the RFCs corpus. Corrections found for
+      misspelled query terms are listed under `expansions`.
     """
 
-    # settings to be used by BM25 ranker function
+    import metapy
+
+    # settings to be used by BM25 ranker function and by the blending
+    # of BM25 scores with the citation graph authority prior
     settings = {
       'top_k': 10,
       'bm25_k1': 1.2,
       'bm25_b': 0.785,
       'bm25_k3': 500,
+      'candidates': 50,
+      'authority_weight': 0.25,
+      'obsoleted_penalty': 0.5,
     }
 
-    idx = metapy.index.make_inverted_index('config.toml')
+    idx = self.idx
 
     ranker = metapy.index.OkapiBM25(k1=settings['bm25_k1'],
                                     b=settings['bm25_b'],
                                     k3=settings['bm25_k3'])
 
+    query_terms, expansions = self.expand_query(query_terms, expand=expand)
+
     query = metapy.index.Document()
     query.content(query_terms)
 
     top_docs = []
-    top_docs = ranker.score(idx, query, num_results=settings['top_k'])
+    # fetch more candidates than needed since blending BM25 scores with
+    # the authority prior might reorder them
+    top_docs = ranker.score(idx, query, num_results=settings['candidates'])
     # `top_docs` is an array of tuples (`doc_idx`, `score`) sorted
     # by score in descending order. Example:
     #   [(0, 24.28896713256836),
@@ -217,19 +734,29 @@ class RFCs:
     # `doc_idx` is the index internally assigned by the inverted index
     # used for information retrieval 
 
-    results = []
-    # fetch metadata for every relevant document returned by ranker
+    candidates = []
     p = re.compile(r'rfc(\d+).txt$')
-    for (doc_idx, score) in top_docs:
+    for (doc_idx, bm25_score) in top_docs:
       rfc_filename = idx.metadata(doc_idx).get('path')
       # transform `filename` into `docid`
       docid = 'RFC' + p.search(rfc_filename).group(1).zfill(4)
-      result = self.get_metadata(docid)
-      result['score'] = score
-      results.append(result)
+      score = bm25_score
+      i = self.metadata['docid_to_index'].get(docid)
+      if i is not None:
+        # boost documents with high authority and demote obsoleted ones
+        score *= 1.0 + settings['authority_weight'] * self.graph['prior'][i]
+        if self.graph['obsoleted'][i]:
+          score *= settings['obsoleted_penalty']
+      candidates.append((docid, float(score), bm25_score))
+    candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+
+    # stitch precomputed metadata for every relevant document after reranking
+    results = [self._hit_json(docid, [('score', score), ('bm25', bm25_score)])
+               for (docid, score, bm25_score) in candidates[:settings['top_k']]]
     # it seems returning a JSON array instead of a dictionary might might
     # be secure (https://haacked.com/archive/2009/06/25/json-hijacking.aspx/)
-    results = {'results': results}
+    results = (b'{"results":[' + b','.join(results) + b'],"expansions":' +
+               json.dumps(expansions).encode('utf8') + b'}')
 
     return results
 
@@ -261,6 +788,9 @@ class RFCs:
       't01' and 't11' to indicate 'Topic 1' and 'Topic 11', respectively.
     """
 
+    import metapy
+    import pandas as pd
+
     fidx = metapy.index.make_forward_index('config.toml')
 
     # load `num_topics` topic model
@@ -329,16 +859,18 @@ class RFCs:
 
     Returns
     -------
-    dict
-      Dictionary with the results consisting of three sections:
+    bytes
+      JSON object with the results consisting of three sections:
        * topics: Top k topics for the given `docid`.
        * words: Top 10 words for every top topic in topics.
        * docs: Docs with largest topic coverage for every top topic in topics
     """
 
-    # if `docid` does not exist in pi_df return an empty dictionary
+    import metapy
+
+    # if `docid` does not exist in pi_df return an empty JSON object
     if docid not in self.pi_df.index:
-      return {}
+      return b'{}'
 
     # get top k topics associated to `docid`
     topics = self.pi_df.loc[docid, :].\
@@ -360,21 +892,20 @@ class RFCs:
                      for pr in model.top_k(tid=tid, scorer=scorer)]
 
     # get top docs for every top k topic
-    docs = OrderedDict()
+    docs = []
     for topic in topics:
       top_k_docids = self.pi_df.loc[:, topic].\
                      sort_values(ascending=False)[0:top_docs_per_topic].\
                      to_dict(into=OrderedDict)
-      metadata_list = []
-      for top_k_docid, score in top_k_docids.items():
-        metadata = self.get_metadata(top_k_docid)
-        if metadata == {}:
-          continue
-        metadata['score'] = score
-        metadata_list.append(metadata)
-      docs[topic] = metadata_list
-
-    return OrderedDict([('k', num_topics),
-                        ('topics', topics),
-                        ('words', words),
-                        ('docs', docs)])
+      metadata_list = [self._hit_json(top_k_docid, [('score', float(score))])
+                       for top_k_docid, score in top_k_docids.items()
+                       if top_k_docid in self.metadata_json]
+      docs.append(json.dumps(topic).encode('utf8') + b':[' +
+                  b','.join(metadata_list) + b']')
+
+    # stitch precomputed metadata of top docs into the rest of the results
+    result = json.dumps(OrderedDict([('k', num_topics),
+                                     ('topics', topics),
+                                     ('words', words)]))
+    return (result.encode('utf8')[:-1] +
+            b',"docs":{' + b','.join(docs) + b'}}')
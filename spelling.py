@@ -0,0 +1,360 @@
+#                    _ _ _
+#                   | | (_)
+#   ___ ____  _____ | | |_ ____   ____
+#  /___)  _ \| ___ || | | |  _ \ / _  |
+# |___ | |_| | ____|| | | | | | ( (_| |
+# (___/|  __/|_____) \_)_)_|_| |_|\___ |
+#      |_|                       (_____|
+#
+# created with https://manytools.org/hacker-tools/ascii-banner/
+
+"""
+Typo-tolerant query correction for RFC Finder based on the symmetric
+delete spelling correction algorithm, a.k.a. SymSpell
+(https://github.com/wolfgarbe/SymSpell).
+
+A spelling dictionary is built from the vocabulary of the inverted index
+and the document frequency of every term by `build_spelling_dictionary()`
+when the index is (re)created by `get_rfcs.py`. For every term, all the
+strings obtained by deleting up to `max_edit_distance` characters from
+its prefix are precomputed and hashed, so looking up a misspelled term
+only needs to generate the deletes of that term and match their hashes
+against the precomputed ones, i.e., no candidate is generated by
+inserting, replacing, or transposing characters at query time.
+
+The dictionary is stored as a set of `.npy` files so it can be memory
+mapped by `SpellingDictionary` at serve time:
+
+- `terms.npy`: vocabulary terms sorted alphabetically (term ID is the
+  position of the term in this array). All vocabulary terms are kept,
+  so they can be told apart from misspellings, but only those frequent
+  and long enough generate deletes, i.e., can be suggested.
+- `doc_freqs.npy`: document frequency of every term.
+- `delete_hashes.npy`: sorted CRC32 hashes of all the deletes.
+- `indptr.npy` and `postings.npy`: CSR arrays mapping every delete hash
+  to the IDs of the terms generating it.
+- `params.npy`: `max_edit_distance` and `prefix_length` used to build
+  the dictionary.
+
+Docstrings in this module styled according to the `NumPy Style Guide
+for Docstrings https://numpydoc.readthedocs.io/en/latest/format.html`_.
+"""
+
+__author__ = 'Gilberto Ramirez'
+__license__ = 'MIT'
+__version__ = '0.0.1'
+__email__ = 'ger6@illinois.edu'
+__status__ = 'Prototype'
+
+import numpy as np
+import os
+import shutil
+import zlib
+
+def get_deletes(term, max_edit_distance, prefix_length):
+  """
+  Get all the strings obtained by deleting up to `max_edit_distance`
+  characters from the first `prefix_length` characters of `term`,
+  including the prefix itself.
+
+  Parameters
+  ----------
+  term : str
+    Term whose deletes will be generated.
+
+  max_edit_distance : int
+    Maximum number of characters to delete.
+
+  prefix_length : int
+    Number of characters at the beginning of `term` considered. Longer
+    prefixes mean more precise lookups but larger dictionaries.
+
+  Returns
+  -------
+  set
+    Set with all the deletes of `term`.
+  """
+
+  prefix = term[:prefix_length]
+  deletes = {prefix}
+  pending = [prefix]
+  for _ in range(max_edit_distance):
+    next_pending = []
+    for word in pending:
+      if len(word) <= 1:
+        continue
+      for i in range(len(word)):
+        delete = word[:i] + word[i + 1:]
+        if delete not in deletes:
+          deletes.add(delete)
+          next_pending.append(delete)
+    pending = next_pending
+
+  return deletes
+
+def edit_distance(a, b, max_distance):
+  """
+  Compute the optimal string alignment distance, i.e., Levenshtein
+  distance plus transpositions of adjacent characters, between `a` and
+  `b`, stopping as soon as it is known to exceed `max_distance`.
+
+  Parameters
+  ----------
+  a : str
+    First string.
+
+  b : str
+    Second string.
+
+  max_distance : int
+    Maximum distance of interest.
+
+  Returns
+  -------
+  int
+    Distance between `a` and `b`, or `max_distance + 1` if it is larger
+    than `max_distance`.
+  """
+
+  if abs(len(a) - len(b)) > max_distance:
+    return max_distance + 1
+
+  # common prefixes and suffixes do not change the distance
+  start = 0
+  while start < len(a) and start < len(b) and a[start] == b[start]:
+    start += 1
+  end = 0
+  while (end < len(a) - start and end < len(b) - start and
+         a[-end - 1] == b[-end - 1]):
+    end += 1
+  a = a[start:len(a) - end]
+  b = b[start:len(b) - end]
+  if len(a) == 0 or len(b) == 0:
+    return min(len(a) + len(b), max_distance + 1)
+
+  previous_previous = None
+  previous = list(range(len(b) + 1))
+  for i in range(1, len(a) + 1):
+    current = [i] + [0] * len(b)
+    for j in range(1, len(b) + 1):
+      cost = 0 if a[i - 1] == b[j - 1] else 1
+      current[j] = min(previous[j] + 1,          # deletion
+                       current[j - 1] + 1,       # insertion
+                       previous[j - 1] + cost)   # substitution
+      if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+        current[j] = min(current[j], previous_previous[j - 2] + 1)   # transposition
+    # no alignment can get back below `max_distance` from here
+    if min(current) > max_distance:
+      return max_distance + 1
+    previous_previous, previous = previous, current
+
+  return min(previous[len(b)], max_distance + 1)
+
+def build_spelling_dictionary(terms, doc_freqs, path, max_edit_distance=2,
+                              prefix_length=7, min_doc_freq=2, min_length=3):
+  """
+  Build a spelling dictionary out of `terms` and their document
+  frequencies and save it in the `path` folder as a set of `.npy` files
+  that can be memory mapped by `SpellingDictionary`.
+
+  Parameters
+  ----------
+  terms : list
+    List of (unique) vocabulary terms.
+
+  doc_freqs : list
+    Document frequency of every term in `terms`.
+
+  path : str
+    Folder where the dictionary files will be saved. Files are written
+    to a temporary folder first, which then replaces `path`, so a build
+    failing halfway never leaves an incomplete dictionary behind.
+
+  max_edit_distance : int
+    Maximum edit distance supported by lookups. Default: 2.
+
+  prefix_length : int
+    Number of characters at the beginning of every term used to generate
+    deletes. Default: 7.
+
+  min_doc_freq : int
+    Minimum document frequency of a term to be suggested. Rarer terms are
+    still part of the dictionary but might be misspellings themselves.
+    Default: 2.
+
+  min_length : int
+    Minimum length of a term to be suggested. Default: 3.
+
+  Returns
+  -------
+  int
+    Number of unique delete hashes in the dictionary.
+  """
+
+  # sorting terms allows to find them using binary search at serve time
+  order = sorted(range(len(terms)), key=lambda i: terms[i])
+  terms = [terms[i] for i in order]
+  doc_freqs = [doc_freqs[i] for i in order]
+
+  hashes = []
+  term_ids = []
+  for term_id, term in enumerate(terms):
+    # terms not worth suggesting are only used to check for membership
+    if doc_freqs[term_id] < min_doc_freq or len(term) < min_length:
+      continue
+    for delete in get_deletes(term, max_edit_distance, prefix_length):
+      hashes.append(zlib.crc32(delete.encode('utf8')))
+      term_ids.append(term_id)
+  hashes = np.array(hashes, dtype=np.uint32)
+  term_ids = np.array(term_ids, dtype=np.uint32)
+
+  # group term IDs by delete hash in CSR form
+  order = np.lexsort((term_ids, hashes))
+  hashes = hashes[order]
+  postings = term_ids[order]
+  delete_hashes, counts = np.unique(hashes, return_counts=True)
+  indptr = np.zeros(len(delete_hashes) + 1, dtype=np.uint32)
+  indptr[1:] = np.cumsum(counts)
+
+  path = os.path.normpath(path)
+  tmp_path = path + '.tmp'
+  if os.path.isdir(tmp_path):
+    shutil.rmtree(tmp_path)
+  os.makedirs(tmp_path)
+  max_length = max([len(term.encode('utf8')) for term in terms] + [1])
+  np.save(os.path.join(tmp_path, 'terms.npy'),
+          np.array([term.encode('utf8') for term in terms],
+                   dtype='S{}'.format(max_length)))
+  np.save(os.path.join(tmp_path, 'doc_freqs.npy'),
+          np.array(doc_freqs, dtype=np.uint32))
+  np.save(os.path.join(tmp_path, 'delete_hashes.npy'), delete_hashes)
+  np.save(os.path.join(tmp_path, 'indptr.npy'), indptr)
+  np.save(os.path.join(tmp_path, 'postings.npy'), postings)
+  # `params.npy` is written last, so its presence means the dictionary
+  # is complete
+  np.save(os.path.join(tmp_path, 'params.npy'),
+          np.array([max_edit_distance, prefix_length], dtype=np.uint32))
+
+  # `os.replace()` cannot replace a non-empty folder, so remove it first
+  if os.path.isdir(path):
+    shutil.rmtree(path)
+  os.replace(tmp_path, path)
+
+  return len(delete_hashes)
+
+class SpellingDictionary:
+  def __init__(self, path):
+    """
+    Constructor memory maps a spelling dictionary previously built with
+    `build_spelling_dictionary()`.
+
+    Parameters
+    ----------
+    path : str
+      Folder where the dictionary files were saved.
+
+    Returns
+    -------
+    SpellingDictionary
+      An instance of the SpellingDictionary class.
+    """
+
+    def load(name):
+      # plain arrays backed by the memory map are much faster to index
+      # than `numpy.memmap` objects
+      return np.asarray(np.load(os.path.join(path, name + '.npy'),
+                                mmap_mode='r'))
+
+    self.terms = load('terms')
+    self.doc_freqs = load('doc_freqs')
+    self.delete_hashes = load('delete_hashes')
+    self.indptr = load('indptr')
+    self.postings = load('postings')
+    self.max_edit_distance, self.prefix_length = [int(param) for param
+                                                  in load('params')]
+
+  def get_term_id(self, term):
+    """
+    Get the term ID of `term`, or None if it is not in the dictionary.
+    """
+
+    term = term.encode('utf8')
+    i = int(np.searchsorted(self.terms, term))
+    if i < len(self.terms) and self.terms[i] == term:
+      return i
+    return None
+
+  def __contains__(self, term):
+    return self.get_term_id(term) is not None
+
+  def _get_candidates(self, term, max_edit_distance):
+    """
+    Get the IDs of the terms sharing at least one delete, i.e., one delete
+    hash, with `term` when deleting up to `max_edit_distance` characters.
+    """
+
+    hashes = np.array([zlib.crc32(delete.encode('utf8')) for delete in
+                       get_deletes(term, max_edit_distance, self.prefix_length)],
+                      dtype=np.uint32)
+    positions = np.searchsorted(self.delete_hashes, hashes)
+    found = positions < len(self.delete_hashes)
+    positions, hashes = positions[found], hashes[found]
+    positions = positions[self.delete_hashes[positions] == hashes]
+
+    candidate_ids = set()
+    for i in positions.tolist():
+      candidate_ids.update(self.postings[self.indptr[i]:self.indptr[i + 1]].tolist())
+
+    return candidate_ids
+
+  def lookup(self, term, max_edit_distance=None, top_k=3):
+    """
+    Look up the terms in the dictionary closest to `term`. Only the
+    suggestions at the smallest edit distance found are returned.
+
+    Parameters
+    ----------
+    term : str
+      Term to be corrected.
+
+    max_edit_distance : int
+      Maximum edit distance between `term` and the suggestions. It
+      cannot be larger than the one used to build the dictionary.
+      Default: the one used to build the dictionary.
+
+    top_k : int
+      Maximum number of suggestions returned, or None to return all of
+      them. Default: 3.
+
+    Returns
+    -------
+    list
+      List of (`suggestion`, `distance`, `doc_freq`) tuples, all of them
+      at the same distance, sorted by decreasing document frequency. If
+      `term` is in the dictionary, it will be the only suggestion.
+    """
+
+    if max_edit_distance is None:
+      max_edit_distance = self.max_edit_distance
+    max_edit_distance = min(max_edit_distance, self.max_edit_distance)
+
+    term_id = self.get_term_id(term)
+    if term_id is not None:
+      return [(term, 0, int(self.doc_freqs[term_id]))]
+
+    # look for suggestions one edit distance at a time, so candidates only
+    # reachable with more edits are not verified if closer ones exist
+    suggestions = []
+    for distance in range(1, max_edit_distance + 1):
+      for candidate_id in self._get_candidates(term, distance):
+        candidate = self.terms[candidate_id].decode('utf8')
+        # hashes might collide and deletes only cover the prefix of terms,
+        # so every candidate needs to be verified
+        if edit_distance(term, candidate, distance) <= distance:
+          suggestions.append((candidate, distance,
+                              int(self.doc_freqs[candidate_id])))
+      if suggestions:
+        break
+    suggestions.sort(key=lambda suggestion: -suggestion[2])
+
+    return suggestions[:top_k]